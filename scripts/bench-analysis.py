@@ -5,217 +5,153 @@ Advanced Red-Black Tree Benchmark Analysis
 Provides detailed performance analysis and comparison
 """
 
-import sys
-import json
-import statistics
-import xml.etree.ElementTree as ET
+import io
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 from collections import defaultdict
 
+from bench_common import load_all, TEST_TYPES
+
+# orjson serializes nested dicts in C; json is the fallback
+try:
+    import orjson
+    
+    def dump_json(obj, f):
+        """Write obj as indented JSON to the binary file f"""
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+except ImportError:
+    import json
+    
+    def dump_json(obj, f):
+        """Write obj as indented JSON to the binary file f"""
+        f.write(json.dumps(obj, indent=2).encode())
+
+def summarize(values):
+    """Summary statistics of a non-empty float array"""
+    return {
+        'mean': float(values.mean()),
+        'median': float(np.median(values)),
+        'stdev': float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+
 class BenchmarkAnalyzer:
     def __init__(self, xml_file):
         self.xml_file = xml_file
-        self.root = self._parse_xml()
-        self.data = self._extract_all_data()
+        metadata, self.data = load_all(xml_file)
+        self.platform = metadata['platform']
+        self.compiler = metadata['compiler']
+        self._stats_cache = {}
     
-    def _parse_xml(self):
-        """Parse XML benchmark results"""
-        try:
-            tree = ET.parse(self.xml_file)
-            return tree.getroot()
-        except ET.ParseError as e:
-            print(f"Error parsing XML file: {e}")
-            sys.exit(1)
-        except FileNotFoundError:
-            print(f"File not found: {self.xml_file}")
-            sys.exit(1)
+    def calculate_statistics(self, test_type=None):
+        """Calculate performance statistics"""
+        test_names = [test_type] if test_type else self.data
+        return {test_name: self._test_statistics(test_name) for test_name in test_names}
     
-    def _extract_all_data(self):
-        """Extract all benchmark data"""
-        data = {}
-        test_types = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
-        
-        for test_type in test_types:
-            data[test_type] = self._extract_test_data(test_type)
+    def _test_statistics(self, test_name):
+        """Calculate statistics for one test type, memoized per analyzer"""
+        if test_name in self._stats_cache:
+            return self._stats_cache[test_name]
         
-        return data
-    
-    def _extract_test_data(self, test_type):
-        """Extract benchmark data for a specific test type"""
-        implementations = {}
+        stats = {}
         
-        for rb_test in self.root.findall('RBTest'):
-            impl = rb_test.get('implementation')
-            node_size = int(rb_test.get('nodeSize', 0))
-            
-            test_section = rb_test.find(test_type)
-            if test_section is None:
+        for impl, impl_data in self.data[test_name].items():
+            samples = impl_data['samples']
+            if not samples:
                 continue
             
-            samples = []
-            for sample in test_section.findall('Sample'):
-                node_count = int(sample.get('nodeCount'))
-                duration = int(sample.get('duration'))
-                insert_count = int(sample.get('insertCount', 0))
-                extract_count = int(sample.get('extractCount', 0))
-                
-                total_ops = insert_count + extract_count
-                if total_ops > 0 and duration > 0:
-                    ops_per_sec = (total_ops * 1e9) / duration
-                    ns_per_op = duration / total_ops
-                else:
-                    ops_per_sec = 0
-                    ns_per_op = float('inf')
-                
-                samples.append({
-                    'node_count': node_count,
-                    'duration_ns': duration,
-                    'insert_count': insert_count,
-                    'extract_count': extract_count,
-                    'total_ops': total_ops,
-                    'ops_per_sec': ops_per_sec,
-                    'ns_per_op': ns_per_op,
-                    'duration_sec': duration / 1e9
-                })
+            _, ops_per_sec = samples.throughput_points
+            ns_per_op = samples.ns_per_op[samples.valid]
+            node_counts = samples.node_count
             
-            if samples:
-                implementations[impl] = {
-                    'samples': samples,
-                    'node_size': node_size
+            if ops_per_sec.size:
+                stats[impl] = {
+                    'node_size': impl_data['node_size'],
+                    'sample_count': len(samples),
+                    'node_count_range': (int(node_counts.min()), int(node_counts.max())),
+                    'ops_per_sec': summarize(ops_per_sec),
+                    'ns_per_op': summarize(ns_per_op)
                 }
         
-        return implementations
-    
-    def calculate_statistics(self, test_type=None):
-        """Calculate performance statistics"""
-        if test_type:
-            test_data = {test_type: self.data[test_type]}
-        else:
-            test_data = self.data
-        
-        stats = {}
-        
-        for test_name, implementations in test_data.items():
-            stats[test_name] = {}
-            
-            for impl, impl_data in implementations.items():
-                samples = impl_data['samples']
-                if not samples:
-                    continue
-                
-                ops_per_sec = [s['ops_per_sec'] for s in samples if s['ops_per_sec'] > 0]
-                ns_per_op = [s['ns_per_op'] for s in samples if s['ns_per_op'] != float('inf')]
-                node_counts = [s['node_count'] for s in samples]
-                
-                if ops_per_sec:
-                    stats[test_name][impl] = {
-                        'node_size': impl_data['node_size'],
-                        'sample_count': len(samples),
-                        'node_count_range': (min(node_counts), max(node_counts)),
-                        'ops_per_sec': {
-                            'mean': statistics.mean(ops_per_sec),
-                            'median': statistics.median(ops_per_sec),
-                            'stdev': statistics.stdev(ops_per_sec) if len(ops_per_sec) > 1 else 0,
-                            'min': min(ops_per_sec),
-                            'max': max(ops_per_sec)
-                        },
-                        'ns_per_op': {
-                            'mean': statistics.mean(ns_per_op),
-                            'median': statistics.median(ns_per_op),
-                            'stdev': statistics.stdev(ns_per_op) if len(ns_per_op) > 1 else 0,
-                            'min': min(ns_per_op),
-                            'max': max(ns_per_op)
-                        }
-                    }
-        
+        # self.data is never modified after __init__, so entries never go stale
+        self._stats_cache[test_name] = stats
         return stats
     
     def generate_detailed_report(self, output_file=None):
         """Generate comprehensive text report"""
         stats = self.calculate_statistics()
         
-        report = []
-        report.append("=" * 60)
-        report.append("RED-BLACK TREE COMPREHENSIVE BENCHMARK REPORT")
-        report.append("=" * 60)
-        report.append("")
-        
-        platform = self.root.get('platform', 'Unknown')
-        compiler = self.root.get('compiler', 'Unknown')
-        report.append(f"Platform: {platform}")
-        report.append(f"Compiler: {compiler}")
-        report.append("")
+        buf = io.StringIO()
+        w = buf.write
+        w(f"{'=' * 60}\n"
+          "RED-BLACK TREE COMPREHENSIVE BENCHMARK REPORT\n"
+          f"{'=' * 60}\n"
+          "\n"
+          f"Platform: {self.platform}\n"
+          f"Compiler: {self.compiler}\n"
+          "\n")
         
         for test_name, test_stats in stats.items():
-            report.append(f"{'=' * 20} {test_name} {'=' * 20}")
-            report.append("")
+            w(f"{'=' * 20} {test_name} {'=' * 20}\n\n")
             
             if not test_stats:
-                report.append("No data available for this test.")
-                report.append("")
+                w("No data available for this test.\n\n")
                 continue
             
             # Find best performing implementation
-            best_impl = None
-            best_ops = 0
-            for impl, impl_stats in test_stats.items():
-                if impl_stats['ops_per_sec']['mean'] > best_ops:
-                    best_ops = impl_stats['ops_per_sec']['mean']
-                    best_impl = impl
+            best_impl = max(test_stats, key=lambda k: test_stats[k]['ops_per_sec']['mean'])
+            best_ops = test_stats[best_impl]['ops_per_sec']['mean']
             
             for impl, impl_stats in test_stats.items():
-                report.append(f"Implementation: {impl}")
-                report.append(f"  Node size: {impl_stats['node_size']} bytes")
-                report.append(f"  Samples: {impl_stats['sample_count']}")
-                report.append(f"  Node count range: {impl_stats['node_count_range'][0]:,} - {impl_stats['node_count_range'][1]:,}")
-                report.append("")
-                
                 ops_stats = impl_stats['ops_per_sec']
                 ns_stats = impl_stats['ns_per_op']
-                
-                report.append("  Operations per second:")
-                report.append(f"    Mean: {ops_stats['mean']:,.0f}")
-                report.append(f"    Median: {ops_stats['median']:,.0f}")
-                report.append(f"    Std Dev: {ops_stats['stdev']:,.0f}")
-                report.append(f"    Range: {ops_stats['min']:,.0f} - {ops_stats['max']:,.0f}")
+                node_min, node_max = impl_stats['node_count_range']
                 
                 if impl == best_impl:
-                    report.append("    ★ BEST PERFORMANCE ★")
+                    ranking = "★ BEST PERFORMANCE ★"
                 else:
                     relative_perf = (ops_stats['mean'] / best_ops) * 100
-                    report.append(f"    Relative to best: {relative_perf:.1f}%")
-                
-                report.append("")
+                    ranking = f"Relative to best: {relative_perf:.1f}%"
                 
-                report.append("  Nanoseconds per operation:")
-                report.append(f"    Mean: {ns_stats['mean']:.1f} ns")
-                report.append(f"    Median: {ns_stats['median']:.1f} ns")
-                report.append(f"    Std Dev: {ns_stats['stdev']:.1f} ns")
-                report.append(f"    Range: {ns_stats['min']:.1f} - {ns_stats['max']:.1f} ns")
-                report.append("")
-                
-                report.append("-" * 40)
-                report.append("")
+                w(f"Implementation: {impl}\n"
+                  f"  Node size: {impl_stats['node_size']} bytes\n"
+                  f"  Samples: {impl_stats['sample_count']}\n"
+                  f"  Node count range: {node_min:,} - {node_max:,}\n"
+                  "\n"
+                  "  Operations per second:\n"
+                  f"    Mean: {ops_stats['mean']:,.0f}\n"
+                  f"    Median: {ops_stats['median']:,.0f}\n"
+                  f"    Std Dev: {ops_stats['stdev']:,.0f}\n"
+                  f"    Range: {ops_stats['min']:,.0f} - {ops_stats['max']:,.0f}\n"
+                  f"    {ranking}\n"
+                  "\n"
+                  "  Nanoseconds per operation:\n"
+                  f"    Mean: {ns_stats['mean']:.1f} ns\n"
+                  f"    Median: {ns_stats['median']:.1f} ns\n"
+                  f"    Std Dev: {ns_stats['stdev']:.1f} ns\n"
+                  f"    Range: {ns_stats['min']:.1f} - {ns_stats['max']:.1f} ns\n"
+                  "\n"
+                  f"{'-' * 40}\n"
+                  "\n")
         
         # Add memory efficiency analysis
-        report.append("=" * 20 + " MEMORY EFFICIENCY " + "=" * 20)
-        report.append("")
+        w(f"{'=' * 20} MEMORY EFFICIENCY {'=' * 20}\n")
         
         for test_name, test_stats in stats.items():
             if not test_stats:
                 continue
             
-            report.append(f"{test_name}:")
+            w(f"\n{test_name}:\n")
             for impl, impl_stats in test_stats.items():
                 node_size = impl_stats['node_size']
                 ops_per_sec = impl_stats['ops_per_sec']['mean']
                 efficiency = ops_per_sec / node_size if node_size > 0 else 0
-                report.append(f"  {impl}: {efficiency:,.0f} ops/sec/byte")
-            report.append("")
+                w(f"  {impl}: {efficiency:,.0f} ops/sec/byte\n")
         
-        report_text = "\n".join(report)
+        report_text = buf.getvalue()
         
         if output_file:
             with open(output_file, 'w') as f:
@@ -229,15 +165,15 @@ class BenchmarkAnalyzer:
     def plot_scalability_analysis(self, output_file=None):
         """Create scalability analysis plots"""
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        axes = axes.flatten()
         
-        test_types = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
         
-        for idx, test_type in enumerate(test_types):
-            if idx >= len(axes.flatten()):
+        for idx, test_type in enumerate(TEST_TYPES):
+            if idx >= len(axes):
                 break
             
-            ax = axes.flatten()[idx]
+            ax = axes[idx]
             implementations = self.data[test_type]
             color_idx = 0
             
@@ -246,11 +182,9 @@ class BenchmarkAnalyzer:
                 if not samples:
                     continue
                 
-                x = [s['node_count'] for s in samples]
-                y = [s['ops_per_sec'] for s in samples if s['ops_per_sec'] > 0]
-                x_filtered = [s['node_count'] for s in samples if s['ops_per_sec'] > 0]
+                x_filtered, y = samples.throughput_points
                 
-                if x_filtered and y:
+                if x_filtered.size:
                     color = colors[color_idx % len(colors)]
                     color_idx += 1
                     
@@ -259,16 +193,13 @@ class BenchmarkAnalyzer:
                              markersize=4, linewidth=2, alpha=0.8)
                     
                     # Add trend line for large datasets
-                    if len(x_filtered) > 5:
+                    if x_filtered.size > 5:
                         # Fit logarithmic trend
-                        log_x = np.log(x_filtered)
-                        log_y = np.log(y)
-                        if len(log_x) > 1:
-                            coeffs = np.polyfit(log_x, log_y, 1)
-                            trend_x = np.logspace(np.log10(min(x_filtered)), 
-                                                np.log10(max(x_filtered)), 100)
-                            trend_y = np.exp(coeffs[1]) * (trend_x ** coeffs[0])
-                            ax.loglog(trend_x, trend_y, '--', color=color, alpha=0.5)
+                        coeffs = np.polyfit(np.log(x_filtered), np.log(y), 1)
+                        trend_x = np.logspace(np.log10(x_filtered.min()),
+                                              np.log10(x_filtered.max()), 100)
+                        trend_y = np.exp(coeffs[1]) * (trend_x ** coeffs[0])
+                        ax.loglog(trend_x, trend_y, '--', color=color, alpha=0.5)
             
             ax.set_xlabel('Node Count')
             ax.set_ylabel('Operations/sec')
@@ -279,9 +210,9 @@ class BenchmarkAnalyzer:
             # Add theoretical O(log n) reference line
             if implementations:
                 sample_impl = next(iter(implementations.values()))
-                sample_x = [s['node_count'] for s in sample_impl['samples']]
-                if sample_x:
-                    ref_x = np.logspace(np.log10(min(sample_x)), np.log10(max(sample_x)), 100)
+                sample_x = sample_impl['samples'].node_count
+                if sample_x.size:
+                    ref_x = np.logspace(np.log10(sample_x.min()), np.log10(sample_x.max()), 100)
                     # Normalize to show O(log n) behavior
                     ref_y = 1e6 / np.log2(ref_x)  # Arbitrary scaling
                     ax.loglog(ref_x, ref_y, 'k:', alpha=0.5, label='O(1/log n) reference')
@@ -291,6 +222,7 @@ class BenchmarkAnalyzer:
         
         if output_file:
             plt.savefig(output_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
             print(f"Scalability analysis saved to {output_file}")
         else:
             plt.show()
@@ -300,8 +232,8 @@ class BenchmarkAnalyzer:
         # Convert data to JSON-serializable format
         json_data = {
             'metadata': {
-                'platform': self.root.get('platform', 'Unknown'),
-                'compiler': self.root.get('compiler', 'Unknown'),
+                'platform': self.platform,
+                'compiler': self.compiler,
                 'xml_file': str(self.xml_file)
             },
             'statistics': self.calculate_statistics(),
@@ -314,11 +246,11 @@ class BenchmarkAnalyzer:
             for impl, impl_data in implementations.items():
                 json_data['raw_data'][test_type][impl] = {
                     'node_size': impl_data['node_size'],
-                    'samples': impl_data['samples']
+                    'samples': impl_data['samples'].to_dicts()
                 }
         
-        with open(output_file, 'w') as f:
-            json.dump(json_data, f, indent=2)
+        with open(output_file, 'wb') as f:
+            dump_json(json_data, f)
         
         print(f"JSON data exported to {output_file}")
 
@@ -334,6 +266,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Plots are only ever saved to files here; skip interactive backend setup
+    matplotlib.use('Agg')
+    
     analyzer = BenchmarkAnalyzer(args.xml_file)
     
     if args.all:
@@ -5,71 +5,27 @@ Red-Black Tree Benchmark Visualization Script
 Adapted from rb-bench plot.py for local rbtree implementation
 """
 
-import sys
 import argparse
-import xml.etree.ElementTree as ET
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-import numpy as np
 from pathlib import Path
 
-def parse_xml(xml_file):
-    """Parse XML benchmark results"""
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        return root
-    except ET.ParseError as e:
-        print(f"Error parsing XML file: {e}")
-        sys.exit(1)
-    except FileNotFoundError:
-        print(f"File not found: {xml_file}")
-        sys.exit(1)
+from bench_common import load_all, TEST_TYPES
 
-def extract_data(root, test_type):
-    """Extract benchmark data for a specific test type"""
-    data = {}
-    
-    for rb_test in root.findall('RBTest'):
-        impl = rb_test.get('implementation')
-        node_size = rb_test.get('nodeSize')
-        
-        test_section = rb_test.find(test_type)
-        if test_section is None:
-            continue
-            
-        samples = []
-        for sample in test_section.findall('Sample'):
-            node_count = int(sample.get('nodeCount'))
-            duration = int(sample.get('duration'))
-            insert_count = int(sample.get('insertCount', 0))
-            extract_count = int(sample.get('extractCount', 0))
-            
-            # Convert to operations per second
-            total_ops = insert_count + extract_count
-            if total_ops > 0 and duration > 0:
-                ops_per_sec = (total_ops * 1e9) / duration
-            else:
-                ops_per_sec = 0
-                
-            samples.append({
-                'node_count': node_count,
-                'duration_ns': duration,
-                'ops_per_sec': ops_per_sec,
-                'duration_sec': duration / 1e9
-            })
-        
-        if samples:
-            data[impl] = {
-                'samples': samples,
-                'node_size': node_size
-            }
-    
-    return data
+SUBPLOT_PARAMS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
 
-def plot_performance(data, test_type, output_file=None):
-    """Create performance plots"""
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+def plot_performance(data, test_type, output_file=None, fig=None):
+    """Create performance plots, redrawing on fig if given"""
+    if fig is None:
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    else:
+        # Start from a blank figure with default margins, as tight_layout
+        # adjusted them for the previous plot
+        fig.clear()
+        fig.subplots_adjust(**{param: matplotlib.rcParams[f'figure.subplot.{param}']
+                               for param in SUBPLOT_PARAMS})
+        ax1, ax2 = fig.subplots(2, 1)
     
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
     color_idx = 0
@@ -79,10 +35,9 @@ def plot_performance(data, test_type, output_file=None):
         if not samples:
             continue
             
-        x = [s['node_count'] for s in samples]
-        y1 = [s['duration_sec'] for s in samples]
-        y2 = [s['ops_per_sec'] for s in samples if s['ops_per_sec'] > 0]
-        x2 = [s['node_count'] for s in samples if s['ops_per_sec'] > 0]
+        x = samples.node_count
+        y1 = samples.duration_sec
+        x2, y2 = samples.throughput_points
         
         color = colors[color_idx % len(colors)]
         color_idx += 1
@@ -91,7 +46,7 @@ def plot_performance(data, test_type, output_file=None):
         ax1.loglog(x, y1, 'o-', color=color, label=impl, markersize=4, linewidth=2)
         
         # Operations per second plot  
-        if x2 and y2:
+        if x2.size:
             ax2.semilogx(x2, y2, 'o-', color=color, label=impl, markersize=4, linewidth=2)
     
     # Format duration plot
@@ -136,11 +91,9 @@ def plot_comparison(data_dict, test_types, output_file=None):
             if not samples:
                 continue
                 
-            x = [s['node_count'] for s in samples]
-            y = [s['ops_per_sec'] for s in samples if s['ops_per_sec'] > 0]
-            x_filtered = [s['node_count'] for s in samples if s['ops_per_sec'] > 0]
+            x_filtered, y = samples.throughput_points
             
-            if x_filtered and y:
+            if x_filtered.size:
                 color = colors[color_idx % len(colors)]
                 color_idx += 1
                 ax.semilogx(x_filtered, y, 'o-', color=color, label=impl, markersize=3, linewidth=1.5)
@@ -160,39 +113,35 @@ def plot_comparison(data_dict, test_types, output_file=None):
     else:
         plt.show()
 
-def generate_report(root, output_file=None):
+def generate_report(metadata, data_dict, output_file=None):
     """Generate text report with benchmark statistics"""
     report = []
     report.append("=== Red-Black Tree Benchmark Report ===\n")
     
-    platform = root.get('platform', 'Unknown')
-    compiler = root.get('compiler', 'Unknown')
-    report.append(f"Platform: {platform}")
-    report.append(f"Compiler: {compiler}\n")
+    report.append(f"Platform: {metadata['platform']}")
+    report.append(f"Compiler: {metadata['compiler']}\n")
     
-    test_types = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
-    
-    for test_type in test_types:
+    for test_type in TEST_TYPES:
         report.append(f"--- {test_type} ---")
-        data = extract_data(root, test_type)
+        data = data_dict[test_type]
         
         for impl, impl_data in data.items():
             samples = impl_data['samples']
             if not samples:
                 continue
                 
-            node_counts = [s['node_count'] for s in samples]
-            ops_per_sec = [s['ops_per_sec'] for s in samples if s['ops_per_sec'] > 0]
+            node_counts = samples.node_count
+            _, ops_per_sec = samples.throughput_points
             
-            if ops_per_sec:
-                avg_ops = np.mean(ops_per_sec)
-                max_ops = np.max(ops_per_sec)
-                min_ops = np.min(ops_per_sec)
+            if ops_per_sec.size:
+                avg_ops = ops_per_sec.mean()
+                max_ops = ops_per_sec.max()
+                min_ops = ops_per_sec.min()
                 
                 report.append(f"  {impl}:")
                 report.append(f"    Node size: {impl_data['node_size']} bytes")
                 report.append(f"    Samples: {len(samples)}")
-                report.append(f"    Node count range: {min(node_counts)} - {max(node_counts)}")
+                report.append(f"    Node count range: {node_counts.min()} - {node_counts.max()}")
                 report.append(f"    Throughput: avg={avg_ops:.0f}, max={max_ops:.0f}, min={min_ops:.0f} ops/sec")
         
         report.append("")
@@ -212,7 +161,7 @@ def main():
     parser = argparse.ArgumentParser(description='Visualize red-black tree benchmark results')
     parser.add_argument('xml_file', help='XML benchmark results file')
     parser.add_argument('--output', '-o', help='Output file for plots')
-    parser.add_argument('--test-type', choices=['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear'],
+    parser.add_argument('--test-type', choices=TEST_TYPES,
                        help='Specific test type to plot')
     parser.add_argument('--comparison', action='store_true', help='Generate comparison plot across all test types')
     parser.add_argument('--report', help='Generate text report file')
@@ -220,30 +169,32 @@ def main():
     
     args = parser.parse_args()
     
-    # Parse XML data
-    root = parse_xml(args.xml_file)
+    # Every plot goes to a file, so skip initializing an interactive backend
+    if args.output:
+        matplotlib.use('Agg')
+    
+    # Load everything the requested outputs need in one pass and share it
+    if args.test_type and not (args.report or args.comparison):
+        metadata, data_dict = load_all(args.xml_file, [args.test_type])
+    else:
+        metadata, data_dict = load_all(args.xml_file)
     
     # Generate report if requested
     if args.report:
-        generate_report(root, args.report)
+        generate_report(metadata, data_dict, args.report)
     
     # Generate plots
     if args.comparison:
         # Generate comparison plot
-        test_types = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
-        data_dict = {}
-        for test_type in test_types:
-            data_dict[test_type] = extract_data(root, test_type)
-        
         output_file = args.output
         if output_file and not output_file.endswith(f'.{args.format}'):
             output_file += f'.{args.format}'
             
-        plot_comparison(data_dict, test_types, output_file)
+        plot_comparison(data_dict, TEST_TYPES, output_file)
         
     elif args.test_type:
         # Generate plot for specific test type
-        data = extract_data(root, args.test_type)
+        data = data_dict[args.test_type]
         
         output_file = args.output
         if output_file and not output_file.endswith(f'.{args.format}'):
@@ -252,11 +203,13 @@ def main():
         plot_performance(data, args.test_type, output_file)
         
     else:
-        # Generate plots for all test types
-        test_types = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
+        # Generate plots for all test types, drawing into one figure when saving
+        fig = None
+        if args.output:
+            fig = plt.figure(figsize=(12, 10))
         
-        for test_type in test_types:
-            data = extract_data(root, test_type)
+        for test_type in TEST_TYPES:
+            data = data_dict[test_type]
             if not data:
                 continue
                 
@@ -266,7 +219,10 @@ def main():
             else:
                 output_file = None
                 
-            plot_performance(data, test_type, output_file)
+            plot_performance(data, test_type, output_file, fig)
+        
+        if fig is not None:
+            plt.close(fig)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
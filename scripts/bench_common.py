@@ -0,0 +1,169 @@
+"""
+Shared loader for Red-Black Tree benchmark results
+Used by bench-plot.py and bench-analysis.py
+"""
+
+import os
+import sys
+import numpy as np
+from functools import cached_property
+from operator import methodcaller
+
+TEST_TYPES = ['SmallSetRandomOps', 'LargeSetRandomOps', 'SmallSetLinear', 'LargeSetLinear']
+
+# Prefer libxml2-backed lxml; the stdlib parser is a drop-in fallback
+try:
+    from lxml import etree as ET
+    ITERPARSE_ARGS = {'huge_tree': True, 'collect_ids': False}
+    # Compiled once, then evaluated against every RBTest element
+    SAMPLE_XPATHS = {test_type: ET.XPath(f'./{test_type}/Sample') for test_type in TEST_TYPES}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    ITERPARSE_ARGS = {}
+    SAMPLE_XPATHS = {test_type: methodcaller('findall', f'{test_type}/Sample')
+                     for test_type in TEST_TYPES}
+
+# Raw per-sample columns as reported by rb-bench
+SAMPLE_DTYPE = np.dtype([
+    ('node_count', np.int64),
+    ('duration_ns', np.int64),
+    ('insert_count', np.int64),
+    ('extract_count', np.int64)
+])
+
+class SampleSet:
+    """Samples of one implementation, stored as a NumPy record array"""
+    
+    def __init__(self, records):
+        self.records = records
+        self.node_count = records['node_count']
+        self.duration_ns = records['duration_ns']
+        self.insert_count = records['insert_count']
+        self.extract_count = records['extract_count']
+    
+    def __len__(self):
+        return len(self.node_count)
+    
+    @cached_property
+    def total_ops(self):
+        return self.insert_count + self.extract_count
+    
+    @cached_property
+    def valid(self):
+        """Samples that performed work in a measurable time"""
+        return (self.total_ops > 0) & (self.duration_ns > 0)
+    
+    @cached_property
+    def ops_per_sec(self):
+        out = np.zeros(len(self))
+        return np.divide(self.total_ops * 1e9, self.duration_ns, out=out, where=self.valid)
+    
+    @cached_property
+    def throughput_points(self):
+        """(node_count, ops_per_sec) of the valid samples, masked in one go"""
+        return self.node_count[self.valid], self.ops_per_sec[self.valid]
+    
+    @cached_property
+    def ns_per_op(self):
+        out = np.full(len(self), np.inf)
+        return np.divide(self.duration_ns, self.total_ops, out=out, where=self.valid)
+    
+    @cached_property
+    def duration_sec(self):
+        return self.duration_ns / 1e9
+    
+    def to_dicts(self):
+        """Materialize per-sample records for serialization
+        
+        ns_per_op is None for invalid samples, since JSON has no infinity.
+        """
+        ns_per_op = [value if ok else None
+                     for value, ok in zip(self.ns_per_op.tolist(), self.valid.tolist())]
+        columns = {
+            'node_count': self.node_count.tolist(),
+            'duration_ns': self.duration_ns.tolist(),
+            'insert_count': self.insert_count.tolist(),
+            'extract_count': self.extract_count.tolist(),
+            'total_ops': self.total_ops.tolist(),
+            'ops_per_sec': self.ops_per_sec.tolist(),
+            'ns_per_op': ns_per_op,
+            'duration_sec': self.duration_sec.tolist()
+        }
+        rows = zip(*columns.values())
+        return [dict(zip(columns, row)) for row in rows]
+
+def load_all(xml_file, test_types=TEST_TYPES):
+    """Load the given test types from an XML benchmark results file
+    
+    Returns (metadata, data) where metadata holds the platform and compiler
+    and data maps test type -> implementation -> {'samples', 'node_size'}.
+    """
+    try:
+        return _stream(xml_file, test_types)
+    except ET.ParseError as e:
+        print(f"Error parsing XML file: {e}")
+        sys.exit(1)
+    except FileNotFoundError:
+        print(f"File not found: {xml_file}")
+        sys.exit(1)
+    except OSError as e:
+        # lxml reports a missing file as a plain OSError
+        if not os.path.exists(xml_file):
+            print(f"File not found: {xml_file}")
+        else:
+            print(f"Error reading {xml_file}: {e}")
+        sys.exit(1)
+
+def _stream(xml_file, test_types=TEST_TYPES):
+    """Extract benchmark data in a single streaming pass over the XML"""
+    metadata = {'platform': 'Unknown', 'compiler': 'Unknown'}
+    data = {test_type: {} for test_type in test_types}
+    sample_xpaths = [(test_type, SAMPLE_XPATHS[test_type]) for test_type in test_types]
+    root = None
+    depth = 0
+    
+    context = ET.iterparse(str(xml_file), events=('start', 'end'), **ITERPARSE_ARGS)
+    for event, elem in context:
+        if event == 'start':
+            if root is None:
+                root = elem
+                metadata['platform'] = root.get('platform', 'Unknown')
+                metadata['compiler'] = root.get('compiler', 'Unknown')
+            depth += 1
+            continue
+        
+        # Results live in RBTest children of the root, whatever its tag
+        depth -= 1
+        if depth != 1 or elem.tag != 'RBTest':
+            continue
+        
+        impl = elem.get('implementation')
+        node_size = int(elem.get('nodeSize', 0))
+        
+        for test_type, sample_xpath in sample_xpaths:
+            sample_elems = sample_xpath(elem)
+            if not sample_elems:
+                continue
+            
+            data[test_type][impl] = {
+                'samples': _extract_samples(sample_elems),
+                'node_size': node_size
+            }
+        
+        # Drop the processed subtree so memory stays O(one RBTest)
+        elem.clear()
+        root.remove(elem)
+    
+    return metadata, data
+
+def _extract_samples(sample_elems):
+    """Extract the samples of one test section"""
+    # Closure lookup of the local _int is cheaper than a builtins lookup per field
+    _int = int
+    # Fetch each element's attribute mapping once instead of calling get() per field
+    records = ((_int(a['nodeCount']),
+                _int(a['duration']),
+                _int(a.get('insertCount', 0)),
+                _int(a.get('extractCount', 0)))
+               for a in (sample.attrib for sample in sample_elems))
+    return SampleSet(np.fromiter(records, dtype=SAMPLE_DTYPE, count=len(sample_elems)))